@@ -1093,6 +1093,8 @@ SENTRY_FEATURES = {
     "organizations:issue-percent-display": False,
     # send organization request notifications through Slack
     "organizations:slack-requests": False,
+    # Send Slack chat.postMessage requests from a task instead of inline
+    "organizations:slack-async-post-message": False,
     # Enable team insights page
     "organizations:team-insights": False,
     # Adds additional filters and a new section to issue alert rules.
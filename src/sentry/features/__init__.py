@@ -145,6 +145,7 @@ default_manager.add("organizations:sso-migration", OrganizationFeature)
 default_manager.add("organizations:sso-rippling", OrganizationFeature)
 default_manager.add("organizations:sso-saml2", OrganizationFeature)
 default_manager.add("organizations:sso-scim", OrganizationFeature, True)
+default_manager.add("organizations:slack-async-post-message", OrganizationFeature, True)
 default_manager.add("organizations:slack-requests", OrganizationFeature, True)
 default_manager.add("organizations:team-insights", OrganizationFeature, True)
 default_manager.add("organizations:symbol-sources", OrganizationFeature)
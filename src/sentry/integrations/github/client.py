@@ -2,8 +2,6 @@ from __future__ import annotations
 
 from datetime import datetime
 
-import sentry_sdk
-
 from sentry.integrations.client import ApiClient
 from sentry.integrations.github.utils import get_jwt
 from sentry.models import Repository
@@ -58,20 +56,9 @@ class GitHubClientMixin(ApiClient):
         Github uses the Link header to provide pagination links. Github recommends using the provided link relations and not constructing our own URL.
         https://docs.github.com/en/rest/guides/traversing-with-pagination
         """
-        try:
-            with sentry_sdk.configure_scope() as scope:
-                parent_span_id = scope.span.span_id
-                trace_id = scope.span.trace_id
-        except AttributeError:
-            parent_span_id = None
-            trace_id = None
-
-        with sentry_sdk.start_transaction(
+        with self._start_http_transaction(
             op=f"{self.integration_type}.http.pagination",
             name=f"{self.integration_type}.http_response.pagination.{self.name}",
-            parent_span_id=parent_span_id,
-            trace_id=trace_id,
-            sampled=True,
         ):
             output = []
             resp = self.get(path, params={"per_page": self.page_size})
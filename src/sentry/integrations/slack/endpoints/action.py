@@ -252,7 +252,7 @@ class SlackActionEndpoint(Endpoint):  # type: ignore
         logging_data["integration_id"] = integration.id
 
         # Determine the issue group action is being taken on
-        group_id = slack_request.callback_data["issue"]
+        group_id = slack_request.callback_data.get("issue")
         logging_data["group_id"] = group_id
 
         try:
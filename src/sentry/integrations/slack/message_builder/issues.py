@@ -1,7 +1,7 @@
-import re
 from typing import (
     Any,
     Callable,
+    Iterable,
     List,
     Mapping,
     MutableMapping,
@@ -39,6 +39,43 @@ from ..utils import build_notification_footer
 
 STATUSES = {"resolved": "resolved", "ignored": "ignored", "unresolved": "re-opened"}
 
+# Button templates for the actions of an unactioned issue message, see `build_actions`.
+ASSIGN_BUTTON: Mapping[str, str] = {
+    "name": "assign",
+    "text": "Select Assignee...",
+    "type": "select",
+}
+IGNORE_BUTTON: Mapping[str, str] = {
+    "name": "status",
+    "type": "button",
+    "text": "Ignore",
+    "value": "ignored",
+}
+STOP_IGNORING_BUTTON: Mapping[str, str] = {
+    "name": "status",
+    "type": "button",
+    "text": "Stop Ignoring",
+    "value": "unresolved",
+}
+RESOLVE_DIALOG_BUTTON: Mapping[str, str] = {
+    "name": "resolve_dialog",
+    "text": "Resolve...",
+    "type": "button",
+    "value": "resolve_dialog",
+}
+RESOLVE_BUTTON: Mapping[str, str] = {
+    "name": "status",
+    "text": "Resolve",
+    "type": "button",
+    "value": "resolved",
+}
+UNRESOLVE_BUTTON: Mapping[str, str] = {
+    "name": "status",
+    "text": "Unresolve",
+    "type": "button",
+    "value": "unresolved",
+}
+
 
 def format_actor_options(actors: Sequence[Union["Team", "User"]]) -> Sequence[Mapping[str, str]]:
     sort_func: Callable[[Mapping[str, str]], Any] = lambda actor: actor["text"]
@@ -54,9 +91,16 @@ def format_actor_option(actor: Union["Team", "User"]) -> Mapping[str, str]:
     raise NotImplementedError
 
 
-def build_attachment_title(obj: Union[Group, Event]) -> str:
-    ev_metadata = obj.get_event_metadata()
-    ev_type = obj.get_event_type()
+def build_attachment_title(
+    obj: Union[Group, Event],
+    ev_type: Optional[str] = None,
+    ev_metadata: Optional[Mapping[str, Any]] = None,
+) -> str:
+    # Callers that already looked up the event type/metadata can pass them in.
+    if ev_type is None:
+        ev_type = obj.get_event_type()
+    if ev_metadata is None:
+        ev_metadata = obj.get_event_metadata()
 
     if ev_type == "error" and "type" in ev_metadata:
         title = ev_metadata["type"]
@@ -72,17 +116,23 @@ def build_attachment_title(obj: Union[Group, Event]) -> str:
     return title_str
 
 
-def build_attachment_text(group: Group, event: Optional[Event] = None) -> Optional[Any]:
+def build_attachment_text(
+    group: Group,
+    event: Optional[Event] = None,
+    ev_type: Optional[str] = None,
+    ev_metadata: Optional[Mapping[str, Any]] = None,
+) -> Optional[Any]:
     # Group and Event both implement get_event_{type,metadata}
     obj = event if event is not None else group
-    ev_metadata = obj.get_event_metadata()
-    ev_type = obj.get_event_type()
-
-    if ev_type == "error":
-        return ev_metadata.get("value") or ev_metadata.get("function")
-    else:
+    if ev_type is None:
+        ev_type = obj.get_event_type()
+    if ev_type != "error":
         return None
 
+    if ev_metadata is None:
+        ev_metadata = obj.get_event_metadata()
+    return ev_metadata.get("value") or ev_metadata.get("function")
+
 
 def build_assigned_text(identity: Identity, assignee: str) -> Optional[str]:
     actor = ActorTuple.from_actor_identifier(assignee)
@@ -113,17 +163,17 @@ def build_action_text(identity: Identity, action: Mapping[str, Any]) -> Optional
         return build_assigned_text(identity, action["selected_options"][0]["value"])
 
     # Resolve actions have additional 'parameters' after ':'
-    status = action["value"].split(":", 1)[0]
+    status = STATUSES.get(action["value"].partition(":")[0])
 
     # Action has no valid action text, ignore
-    if status not in STATUSES:
+    if status is None:
         return None
 
-    return f"*Issue {STATUSES[status]} by <@{identity.external_id}>*"
+    return f"*Issue {status} by <@{identity.external_id}>*"
 
 
 def build_rule_url(rule: Any, group: Group, project: Project) -> str:
-    org_slug = group.organization.slug
+    org_slug = project.organization.slug
     project_slug = project.slug
     rule_url = f"/organizations/{org_slug}/alerts/rules/{project_slug}/{rule.id}/"
 
@@ -147,28 +197,33 @@ def build_footer(group: Group, project: Project, rules: Optional[Sequence[Rule]]
 def build_tag_fields(
     event_for_tags: Any, tags: Optional[Set[str]] = None
 ) -> Sequence[Mapping[str, Union[str, bool]]]:
-    fields = []
-    if tags:
-        event_tags = event_for_tags.tags if event_for_tags else []
-        for key, value in event_tags:
-            std_key = tagstore.get_standardized_key(key)
-            if std_key not in tags:
-                continue
-
-            labeled_value = tagstore.get_tag_value_label(key, value)
-            fields.append(
-                {
-                    "title": std_key.encode("utf-8"),
-                    "value": labeled_value.encode("utf-8"),
-                    "short": True,
-                }
-            )
-    return fields
+    if not tags or not event_for_tags:
+        return []
+
+    event_tags = []
+    for key, value in event_for_tags.tags:
+        std_key = tagstore.get_standardized_key(key)
+        if std_key in tags:
+            event_tags.append((key, value, std_key))
+
+    labeled_values = tagstore.get_tag_value_labels([(key, value) for key, value, _ in event_tags])
+
+    return [
+        {"title": std_key, "value": labeled_values[(key, value)], "short": True}
+        for key, value, std_key in event_tags
+    ]
 
 
 def get_option_groups(group: Group) -> Sequence[Mapping[str, Any]]:
-    members = User.objects.get_from_group(group).distinct()
-    teams = group.project.teams.all()
+    # The assignee options only depend on the project's teams and members, so
+    # share them between every group of the project for a short while.
+    cache_key = f"slack:option_groups:{group.project_id}"
+    option_groups: Optional[List[Mapping[str, Any]]] = cache.get(cache_key)
+    if option_groups is not None:
+        return option_groups
+
+    members = User.objects.get_from_group(group).distinct().only("id", "name", "email", "username")
+    teams = group.project.teams.only("id", "slug")
 
     option_groups = []
     if teams:
@@ -177,19 +232,39 @@ def get_option_groups(group: Group) -> Sequence[Mapping[str, Any]]:
     if members:
         option_groups.append({"text": "People", "options": format_actor_options(members)})
 
+    cache.set(cache_key, option_groups, 60)
     return option_groups
 
 
+def _has_releases_cache_key(project_id: int) -> str:
+    return f"has_releases:2:{project_id}"
+
+
+def has_releases_bulk(project_ids: Iterable[int]) -> Mapping[int, bool]:
+    cache_keys = {_has_releases_cache_key(project_id): project_id for project_id in project_ids}
+    cached = cache.get_many(list(cache_keys))
+    result: MutableMapping[int, bool] = {cache_keys[key]: value for key, value in cached.items()}
+
+    missing = set(cache_keys.values()) - set(result)
+    if missing:
+        with_releases = set(
+            ReleaseProject.objects.filter(project_id__in=missing)
+            .values_list("project_id", flat=True)
+            .distinct()
+        )
+        for project_id in missing:
+            result[project_id] = project_id in with_releases
+
+        cache.set_many({_has_releases_cache_key(pid): True for pid in missing if result[pid]}, 3600)
+        cache.set_many(
+            {_has_releases_cache_key(pid): False for pid in missing if not result[pid]}, 300
+        )
+
+    return result
+
+
 def has_releases(project: Project) -> bool:
-    cache_key = f"has_releases:2:{project.id}"
-    has_releases_option: Optional[bool] = cache.get(cache_key)
-    if has_releases_option is None:
-        has_releases_option = ReleaseProject.objects.filter(project_id=project.id).exists()
-        if has_releases_option:
-            cache.set(cache_key, True, 3600)
-        else:
-            cache.set(cache_key, False, 60)
-    return has_releases_option
+    return has_releases_bulk([project.id])[project.id]
 
 
 def get_action_text(
@@ -197,17 +272,8 @@ def get_action_text(
     actions: Sequence[Any],
     identity: Optional[Identity] = None,
 ) -> str:
-    return (
-        text
-        + "\n"
-        + "\n".join(
-            [
-                action_text
-                for action_text in [build_action_text(identity, action) for action in actions]
-                if action_text
-            ]
-        )
-    )
+    action_texts = filter(None, (build_action_text(identity, action) for action in actions))
+    return text + "\n" + "\n".join(action_texts)
 
 
 def build_actions(
@@ -217,50 +283,33 @@ def build_actions(
     color: str,
     actions: Optional[Sequence[Any]] = None,
     identity: Optional[Identity] = None,
+    project_has_releases: Optional[bool] = None,
 ) -> Tuple[Sequence[Any], str, str]:
     """Having actions means a button will be shown on the Slack message e.g. ignore, resolve, assign."""
     if actions:
-        text += get_action_text(text, actions, identity)
+        text = get_action_text(text, actions, identity)
         return [], text, "_actioned_issue"
 
-    ASSIGN_BUTTON: MutableMapping[str, Any] = {
-        "name": "assign",
-        "text": "Select Assignee...",
-        "type": "select",
-    }
-    IGNORE_BUTTON = {
-        "name": "status",
-        "type": "button",
-        "text": "Ignore",
-        "value": "ignored",
-    }
-    RESOLVE_BUTTON = {
-        "name": "resolve_dialog",
-        "text": "Resolve...",
-        "type": "button",
-        "value": "resolve_dialog",
-    }
-
     status = group.get_status()
 
-    if not has_releases(project):
-        RESOLVE_BUTTON.update({"name": "status", "text": "Resolve", "value": "resolved"})
-
     if status == GroupStatus.RESOLVED:
-        RESOLVE_BUTTON.update({"name": "status", "text": "Unresolve", "value": "unresolved"})
+        resolve_button = UNRESOLVE_BUTTON
+    else:
+        if project_has_releases is None:
+            project_has_releases = has_releases(project)
+        resolve_button = RESOLVE_DIALOG_BUTTON if project_has_releases else RESOLVE_BUTTON
 
-    if status == GroupStatus.IGNORED:
-        IGNORE_BUTTON.update({"text": "Stop Ignoring", "value": "unresolved"})
+    ignore_button = STOP_IGNORING_BUTTON if status == GroupStatus.IGNORED else IGNORE_BUTTON
 
     assignee = group.get_assignee()
-    ASSIGN_BUTTON.update(
-        {
-            "selected_options": format_actor_options([assignee]) if assignee else [],
-            "option_groups": get_option_groups(group),
-        }
-    )
+    assign_button: MutableMapping[str, Any] = {
+        **ASSIGN_BUTTON,
+        "selected_options": format_actor_options([assignee]) if assignee else [],
+        "option_groups": get_option_groups(group),
+    }
 
-    return [RESOLVE_BUTTON, IGNORE_BUTTON, ASSIGN_BUTTON], text, color
+    # Hand out copies so callers can't modify the shared templates.
+    return [dict(resolve_button), dict(ignore_button), assign_button], text, color
 
 
 def get_title_link(
@@ -274,7 +323,9 @@ def get_title_link(
         url = group.get_absolute_url(params={"referrer": "slack"}, event_id=event.event_id)
 
     elif issue_details:
-        referrer = re.sub("Notification$", "Slack", notification.__class__.__name__)
+        referrer = notification.__class__.__name__
+        if referrer.endswith("Notification"):
+            referrer = referrer[: -len("Notification")] + "Slack"
         url = group.get_absolute_url(params={"referrer": referrer})
 
     else:
@@ -290,10 +341,13 @@ def get_timestamp(group: Group, event: Optional[Event]) -> float:
     return to_timestamp(max(ts, event.datetime) if event else ts)
 
 
+def needs_level_color(notification: Optional[BaseNotification]) -> bool:
+    return notification is None or isinstance(notification, AlertRuleNotification)
+
+
 def get_color(event_for_tags: Optional[Event], notification: Optional[BaseNotification]) -> str:
-    if notification:
-        if not isinstance(notification, AlertRuleNotification):
-            return "info"
+    if not needs_level_color(notification):
+        return "info"
     if event_for_tags:
         color: Optional[str] = event_for_tags.get_tag("level")
         if color and color in LEVEL_TO_COLOR.keys():
@@ -314,6 +368,8 @@ class SlackIssuesMessageBuilder(SlackMessageBuilder):
         issue_details: bool = False,
         notification: Optional[ProjectNotification] = None,
         recipient: Optional[Union["Team", "User"]] = None,
+        project: Optional[Project] = None,
+        project_has_releases: Optional[bool] = None,
     ) -> None:
         super().__init__()
         self.group = group
@@ -326,14 +382,24 @@ class SlackIssuesMessageBuilder(SlackMessageBuilder):
         self.issue_details = issue_details
         self.notification = notification
         self.recipient = recipient
+        self.project = project
+        self.project_has_releases = project_has_releases
 
     def build(self) -> SlackBody:
         # XXX(dcramer): options are limited to 100 choices, even when nested
-        text = build_attachment_text(self.group, self.event) or ""
-        project = Project.objects.get_from_cache(id=self.group.project_id)
+        # Group and Event both implement get_event_{type,metadata}, look them up once.
+        obj = self.event if self.event is not None else self.group
+        ev_type = obj.get_event_type()
+        ev_metadata = obj.get_event_metadata()
+
+        text = build_attachment_text(self.group, self.event, ev_type, ev_metadata) or ""
+        project = self.project or Project.objects.get_from_cache(id=self.group.project_id)
 
         # If an event is unspecified, use the tags of the latest event (if one exists).
-        event_for_tags = self.event or self.group.get_latest_event()
+        # The latest event is only fetched when its tags are actually rendered.
+        event_for_tags = self.event
+        if event_for_tags is None and (self.tags or needs_level_color(self.notification)):
+            event_for_tags = self.group.get_latest_event()
         color = get_color(event_for_tags, self.notification)
         fields = build_tag_fields(event_for_tags, self.tags)
         footer = (
@@ -341,10 +407,15 @@ class SlackIssuesMessageBuilder(SlackMessageBuilder):
             if self.notification and self.recipient
             else build_footer(self.group, project, self.rules)
         )
-        obj = self.event if self.event is not None else self.group
         if not self.issue_details or (self.recipient and isinstance(self.recipient, Team)):
             payload_actions, text, color = build_actions(
-                self.group, project, text, color, self.actions, self.identity
+                self.group,
+                project,
+                text,
+                color,
+                self.actions,
+                self.identity,
+                self.project_has_releases,
             )
         else:
             payload_actions = []
@@ -356,7 +427,7 @@ class SlackIssuesMessageBuilder(SlackMessageBuilder):
             fields=fields,
             footer=footer,
             text=text,
-            title=build_attachment_title(obj),
+            title=build_attachment_title(obj, ev_type, ev_metadata),
             title_link=get_title_link(
                 self.group, self.event, self.link_to_event, self.issue_details, self.notification
             ),
@@ -373,8 +444,19 @@ def build_group_attachment(
     rules: Optional[List[Rule]] = None,
     link_to_event: bool = False,
     issue_details: bool = False,
+    project: Optional[Project] = None,
+    project_has_releases: Optional[bool] = None,
 ) -> SlackBody:
     """@deprecated"""
     return SlackIssuesMessageBuilder(
-        group, event, tags, identity, actions, rules, link_to_event, issue_details
+        group,
+        event,
+        tags,
+        identity,
+        actions,
+        rules,
+        link_to_event,
+        issue_details,
+        project=project,
+        project_has_releases=project_has_releases,
     ).build()
@@ -75,6 +75,7 @@ class SlackProjectNotificationsMessageBuilder(SlackNotificationsMessageBuilder):
                 issue_details=True,
                 notification=self.notification,
                 recipient=self.recipient,
+                project=self.notification.project,
             ).build()
 
         if isinstance(self.notification, ReleaseActivityNotification):
@@ -2,6 +2,7 @@ import logging
 from collections import defaultdict
 from typing import Any, Iterable, Mapping, MutableMapping, Optional, Union
 
+from sentry import features
 from sentry.integrations.notifications import NotifyBasicMixin
 from sentry.integrations.slack.client import SlackClient  # NOQA
 from sentry.integrations.slack.message_builder.notifications import build_notification_attachment
@@ -136,6 +137,7 @@ def send_notification_as_slack(
     """Send an "activity" or "alert rule" notification to a Slack user or team."""
     client = SlackClient()
     data = get_channel_and_token_by_recipient(notification.organization, recipients)
+    post_async = features.has("organizations:slack-async-post-message", notification.organization)
 
     for recipient, tokens_by_channel in data.items():
         is_multiple = True if len([token for token in tokens_by_channel]) > 1 else False
@@ -162,19 +164,31 @@ def send_notification_as_slack(
                 "text": notification.get_notification_title(),
                 "attachments": json.dumps(attachment),
             }
-            try:
-                client.post("/chat.postMessage", data=payload, timeout=5)
-            except ApiError as e:
-                logger.info(
-                    "notification.fail.slack_post",
-                    extra={
-                        "error": str(e),
-                        "notification": notification,
-                        "recipient": recipient.id,
-                        "channel_id": channel,
-                        "is_multiple": is_multiple,
-                    },
+            log_params = {
+                "notification": notification,
+                "recipient": recipient.id,
+                "channel_id": channel,
+                "is_multiple": is_multiple,
+            }
+            if post_async:
+                from sentry.integrations.slack.tasks import post_message
+
+                log_params["notification"] = str(notification)
+                post_message.apply_async(
+                    kwargs={
+                        "payload": payload,
+                        "log_error_message": "notification.fail.slack_post",
+                        "log_params": log_params,
+                    }
                 )
+            else:
+                try:
+                    client.post("/chat.postMessage", data=payload, timeout=5)
+                except ApiError as e:
+                    logger.info(
+                        "notification.fail.slack_post",
+                        extra={"error": str(e), **log_params},
+                    )
             notification.record_notification_sent(recipient, ExternalProviders.SLACK)
 
     key = notification.metrics_key
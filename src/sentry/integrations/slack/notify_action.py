@@ -5,6 +5,7 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.utils.translation import ugettext_lazy as _
 
+from sentry import features
 from sentry.eventstore.models import Event
 from sentry.integrations.slack.message_builder.issues import build_group_attachment
 from sentry.models import Integration
@@ -196,19 +197,28 @@ class SlackNotifyServiceAction(IntegrationEventAction):  # type: ignore
                 "attachments": json.dumps(attachments),
             }
 
+            log_params = {
+                "project_id": event.project_id,
+                "event_id": event.event_id,
+                "channel_name": self.get_option("channel"),
+            }
+            if features.has("organizations:slack-async-post-message", self.project.organization):
+                from sentry.integrations.slack.tasks import post_message
+
+                post_message.apply_async(
+                    kwargs={
+                        "payload": payload,
+                        "log_error_message": "rule.fail.slack_post",
+                        "log_params": log_params,
+                    }
+                )
+                return
+
             client = SlackClient()
             try:
                 client.post("/chat.postMessage", data=payload, timeout=5)
             except ApiError as e:
-                self.logger.info(
-                    "rule.fail.slack_post",
-                    extra={
-                        "error": str(e),
-                        "project_id": event.project_id,
-                        "event_id": event.event_id,
-                        "channel_name": self.get_option("channel"),
-                    },
-                )
+                self.logger.info("rule.fail.slack_post", extra={"error": str(e), **log_params})
 
         key = f"slack:{integration.id}:{channel}"
 
@@ -38,7 +38,10 @@ class SlackActionRequest(SlackRequest):
             - orig_response_url: URL from the original message we received
             - is_message: did the original message have a 'message' type
         """
-        return json.loads(self.data.get("callback_id"))
+        callback_id = self.data.get("callback_id")
+        if not callback_id:
+            return {}
+        return json.loads(callback_id, use_rapid_json=True)
 
     def _validate_data(self) -> None:
         """
@@ -52,7 +55,7 @@ class SlackActionRequest(SlackRequest):
             raise SlackRequestError(status=400)
 
         try:
-            self._data = json.loads(self.data["payload"])
+            self._data = json.loads(self.data["payload"], use_rapid_json=True)
         except (KeyError, IndexError, TypeError, ValueError):
             raise SlackRequestError(status=400)
 
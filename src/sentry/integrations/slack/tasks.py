@@ -1,5 +1,5 @@
 import logging
-from typing import Any, Optional, Sequence
+from typing import Any, Mapping, Optional, Sequence
 from uuid import uuid4
 
 from django.conf import settings
@@ -29,12 +29,17 @@ from sentry.models import (
     User,
     UserEmail,
 )
-from sentry.shared_integrations.exceptions import ApiRateLimitedError, DuplicateDisplayNameError
+from sentry.shared_integrations.exceptions import (
+    ApiError,
+    ApiRateLimitedError,
+    DuplicateDisplayNameError,
+)
 from sentry.tasks.base import instrumented_task
 from sentry.utils import json
 from sentry.utils.json import JSONData
 from sentry.utils.redis import redis_clusters
 
+from .client import SlackClient
 from .utils import (
     SLACK_RATE_LIMITED_MESSAGE,
     get_channel_id_with_timeout,
@@ -318,3 +323,18 @@ def link_slack_user_identities(integration: Integration, organization: Organizat
                     "type": idp.type,
                 },
             )
+
+
+@instrumented_task(  # type: ignore
+    name="sentry.integrations.slack.post_message", queue="integrations", max_retries=0
+)
+def post_message(
+    payload: Mapping[str, Any], log_error_message: str, log_params: Mapping[str, Any]
+) -> None:
+    """Send a `chat.postMessage` request outside of the caller's request/response cycle."""
+    client = SlackClient()
+    try:
+        client.post("/chat.postMessage", data=payload, timeout=5)
+    except ApiError as e:
+        extra = {"error": str(e), **log_params}
+        logger.info(log_error_message, extra=extra)
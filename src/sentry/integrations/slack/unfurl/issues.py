@@ -4,7 +4,10 @@ from typing import List, Optional
 from django.http.request import HttpRequest
 
 from sentry import eventstore
-from sentry.integrations.slack.message_builder.issues import build_group_attachment
+from sentry.integrations.slack.message_builder.issues import (
+    build_group_attachment,
+    has_releases_bulk,
+)
 from sentry.models import Group, Integration, Project, User
 
 from . import Handler, UnfurlableUrl, UnfurledUrl, make_type_coercer
@@ -33,11 +36,13 @@ def unfurl_issues(
         for g in Group.objects.filter(
             id__in={link.args["issue_id"] for link in links},
             project__in=Project.objects.filter(organization__in=integration.organizations.all()),
-        )
+        ).select_related("project__organization")
     }
     if not group_by_id:
         return {}
 
+    has_releases_by_project = has_releases_bulk({g.project_id for g in group_by_id.values()})
+
     out = {}
     for link in links:
         issue_id = link.args["issue_id"]
@@ -48,7 +53,11 @@ def unfurl_issues(
             event_id = link.args["event_id"]
             event = eventstore.get_event_by_id(group.project_id, event_id) if event_id else None
             out[link.url] = build_group_attachment(
-                group_by_id[issue_id], event=event, link_to_event=True
+                group,
+                event=event,
+                link_to_event=True,
+                project=group.project,
+                project_has_releases=has_releases_by_project[group.project_id],
             )
     return out
 
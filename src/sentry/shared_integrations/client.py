@@ -1,9 +1,10 @@
 import logging
-from collections import OrderedDict
+import re
+import time
+from http.cookiejar import DefaultCookiePolicy
 
-import requests
+import mmh3
 import sentry_sdk
-from bs4 import BeautifulSoup
 from django.core.cache import cache
 from django.utils.functional import cached_property
 from requests.exceptions import ConnectionError, HTTPError, Timeout
@@ -12,17 +13,27 @@ from sentry.api.client import ApiClient
 from sentry.http import build_session
 from sentry.utils import json, metrics
 from sentry.utils.decorators import classproperty
-from sentry.utils.hashlib import md5_text
 
 from .exceptions import ApiError, ApiHostError, ApiTimeoutError, UnsupportedResponseType
 
+# e.g. `<https://api.github.com/repos?page=2>; rel="next", <https://api.github.com/repos?page=5>; rel="last"`
+_LINK_RE = re.compile(r"<(?P<url>[^>]*)>(?P<params>[^<]*)")
+_LINK_REL_RE = re.compile(r";\s*rel\s*=\s*[\"']?([^\"';,]+)")
+
 
 class BaseApiResponse:
+    # Responses are created for every integration API call, so skip the
+    # per-instance ``__dict__``. The attributes are declared as slots on the
+    # concrete classes because ``dict``/``list`` subclasses can't share a base
+    # that has a non-empty instance layout.
+    __slots__ = ()
+
     text = ""
 
     def __init__(self, headers=None, status_code=None):
         self.headers = headers
         self.status_code = status_code
+        self._rel = None
 
     def __repr__(self):
         return "<{}: code={}, content_type={}>".format(
@@ -31,37 +42,51 @@ class BaseApiResponse:
             self.headers.get("Content-Type", "") if self.headers else "",
         )
 
-    @cached_property
+    @property
     def rel(self):
+        if self._rel is None:
+            self._rel = self._parse_rel()
+        return self._rel
+
+    def _parse_rel(self):
         if not self.headers:
             return {}
         link_header = self.headers.get("Link")
         if not link_header:
             return {}
-        return {item["rel"]: item["url"] for item in requests.utils.parse_header_links(link_header)}
+        links = {}
+        for match in _LINK_RE.finditer(link_header):
+            rel = _LINK_REL_RE.search(match.group("params"))
+            if rel:
+                links[rel.group(1)] = match.group("url").strip()
+        return links
 
     @classmethod
     def from_response(self, response, allow_text=False):
         if response.request.method == "HEAD":
-            return BaseApiResponse(response.headers, response.status_code)
+            return HeadApiResponse(response.headers, response.status_code)
+        # Decoding ``response.text`` is not free (requests re-decodes the body on
+        # every access), so sniff the raw bytes and only decode for XML/HTML.
         # XXX(dcramer): this doesnt handle leading spaces, but they're not common
         # paths so its ok
-        if response.text.startswith("<?xml"):
+        content = response.content
+        if content.startswith(b"<?xml"):
             return XmlApiResponse(response.text, response.headers, response.status_code)
-        elif response.text.startswith("<"):
+        elif content.startswith(b"<"):
+            text = response.text
             if not allow_text:
-                raise ValueError(f"Not a valid response type: {response.text[:128]}")
+                raise ValueError(f"Not a valid response type: {text[:128]}")
             elif response.status_code < 200 or response.status_code >= 300:
                 raise ValueError(
                     f"Received unexpected plaintext response for code {response.status_code}"
                 )
-            return TextApiResponse(response.text, response.headers, response.status_code)
+            return TextApiResponse(text, response.headers, response.status_code)
 
         # Some APIs will return JSON with an invalid content-type, so we try
         # to decode it anyways
         if "application/json" not in response.headers.get("Content-Type", ""):
             try:
-                data = json.loads(response.text, object_pairs_hook=OrderedDict)
+                data = json.loads(content, use_rapid_json=True)
             except (TypeError, ValueError):
                 if allow_text:
                     return TextApiResponse(response.text, response.headers, response.status_code)
@@ -69,7 +94,7 @@ class BaseApiResponse:
                     response.headers.get("Content-Type", ""), response.status_code
                 )
         else:
-            data = json.loads(response.text, object_pairs_hook=OrderedDict)
+            data = json.loads(content, use_rapid_json=True)
 
         if isinstance(data, dict):
             return MappingApiResponse(data, response.headers, response.status_code)
@@ -79,19 +104,42 @@ class BaseApiResponse:
             raise NotImplementedError
 
 
+_RESPONSE_SLOTS = ("headers", "status_code", "_rel")
+
+
+class HeadApiResponse(BaseApiResponse):
+    __slots__ = _RESPONSE_SLOTS
+
+
 class TextApiResponse(BaseApiResponse):
+    __slots__ = _RESPONSE_SLOTS + ("text",)
+
     def __init__(self, text, *args, **kwargs):
         self.text = text
         super().__init__(*args, **kwargs)
 
 
 class XmlApiResponse(BaseApiResponse):
+    __slots__ = _RESPONSE_SLOTS + ("_text", "_xml")
+
     def __init__(self, text, *args, **kwargs):
-        self.xml = BeautifulSoup(text, "xml")
+        self._text = text
+        self._xml = None
         super().__init__(*args, **kwargs)
 
+    @property
+    def xml(self):
+        if self._xml is None:
+            # bs4 (and lxml) are slow to import, only pull them in when XML is read.
+            from bs4 import BeautifulSoup
+
+            self._xml = BeautifulSoup(self._text, "xml")
+        return self._xml
+
 
 class MappingApiResponse(dict, BaseApiResponse):
+    __slots__ = _RESPONSE_SLOTS
+
     def __init__(self, data, *args, **kwargs):
         dict.__init__(self, data)
         BaseApiResponse.__init__(self, *args, **kwargs)
@@ -102,6 +150,8 @@ class MappingApiResponse(dict, BaseApiResponse):
 
 
 class SequenceApiResponse(list, BaseApiResponse):
+    __slots__ = _RESPONSE_SLOTS
+
     def __init__(self, data, *args, **kwargs):
         list.__init__(self, data)
         BaseApiResponse.__init__(self, *args, **kwargs)
@@ -124,6 +174,22 @@ class TrackResponseMixin:
     def name(cls):
         return getattr(cls, cls.name_field)
 
+    def _start_http_transaction(self, op=None, name=None):
+        """
+        Start a transaction for outgoing requests, continuing the current trace
+        (if there is one) so the request shows up under its caller.
+        """
+        # Reading the span off the current scope directly is cheaper than
+        # entering ``sentry_sdk.configure_scope()`` for every request.
+        parent_span = sentry_sdk.Hub.current.scope.span
+        return sentry_sdk.start_transaction(
+            op=op or f"{self.integration_type}.http",
+            name=name or f"{self.integration_type}.http_response.{self.name}",
+            parent_span_id=parent_span.span_id if parent_span else None,
+            trace_id=parent_span.trace_id if parent_span else None,
+            sampled=True,
+        )
+
     def track_response_data(self, code, span, error=None, resp=None):
         metrics.incr(
             "%s.http_response" % (self.datadog_prefix),
@@ -162,10 +228,21 @@ class BaseApiClient(TrackResponseMixin):
 
     cache_time = 900
 
+    # Seconds a cache miss in ``get_cached`` holds the refresh lock at most, in
+    # case the lock holder dies before releasing it.
+    cache_lock_timeout = 5
+
+    # Callers that miss the lock poll the cache this many seconds apart until
+    # the lock holder stores its result or releases the lock, for at most
+    # ``cache_lock_timeout`` seconds.
+    cache_lock_retry_delay = 0.05
+
     page_size = 100
 
     page_number_limit = 10
 
+    _session = None
+
     def __init__(self, verify_ssl=True, logging_context=None):
         self.verify_ssl = verify_ssl
         self.logging_context = logging_context
@@ -174,11 +251,29 @@ class BaseApiClient(TrackResponseMixin):
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        # TODO(joshuarli): Look into reusing a SafeSession, and closing it here.
-        #                  Don't want to make the change until I completely understand
-        #                  urllib3 machinery + how we override it, possibly do this
-        #                  along with urllib3 upgrade.
-        pass
+        self.close()
+
+    @property
+    def session(self):
+        """
+        A ``SafeSession`` shared by every request made through this client, so
+        that consecutive requests to the same host reuse pooled connections
+        instead of paying for a new TCP/TLS handshake each time.
+
+        The session never stores cookies, so a cookie set by one response is not
+        sent along with later requests. Pooled connections are only released by
+        ``close()`` (or leaving a ``with client:`` block), otherwise they stay
+        open until the client is garbage collected.
+        """
+        if self._session is None:
+            self._session = build_session()
+            self._session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return self._session
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
 
     def get_cache_prefix(self):
         return f"{self.integration_type}.{self.name}.client:"
@@ -224,35 +319,20 @@ class BaseApiClient(TrackResponseMixin):
             tags={self.integration_type: self.name},
         )
 
-        try:
-            with sentry_sdk.configure_scope() as scope:
-                parent_span_id = scope.span.span_id
-                trace_id = scope.span.trace_id
-        except AttributeError:
-            parent_span_id = None
-            trace_id = None
-
-        with sentry_sdk.start_transaction(
-            op=f"{self.integration_type}.http",
-            name=f"{self.integration_type}.http_response.{self.name}",
-            parent_span_id=parent_span_id,
-            trace_id=trace_id,
-            sampled=True,
-        ) as span:
+        with self._start_http_transaction() as span:
             try:
-                with build_session() as session:
-                    resp = getattr(session, method.lower())(
-                        url=full_url,
-                        headers=headers,
-                        json=data if json else None,
-                        data=data if not json else None,
-                        params=params,
-                        auth=auth,
-                        verify=self.verify_ssl,
-                        allow_redirects=allow_redirects,
-                        timeout=timeout,
-                    )
-                    resp.raise_for_status()
+                resp = getattr(self.session, method.lower())(
+                    url=full_url,
+                    headers=headers,
+                    json=data if json else None,
+                    data=data if not json else None,
+                    params=params,
+                    auth=auth,
+                    verify=self.verify_ssl,
+                    allow_redirects=allow_redirects,
+                    timeout=timeout,
+                )
+                resp.raise_for_status()
             except ConnectionError as e:
                 self.track_response_data("connection_error", span, e)
                 raise ApiHostError.from_exception(e)
@@ -284,16 +364,39 @@ class BaseApiClient(TrackResponseMixin):
     def delete(self, *args, **kwargs):
         return self.request("DELETE", *args, **kwargs)
 
+    def get_cache_key(self, path, params=None):
+        query = json.dumps(params, sort_keys=True) if params else ""
+        # Only the variable tail is hashed, the prefix stays human readable.
+        # MurmurHash3 is a lot cheaper than md5 and we don't need a cryptographic hash here.
+        return f"{self.get_cache_prefix()}{mmh3.hash128(self.build_url(path) + query):032x}"
+
     def _get_cached(self, path: str, method: str, *args, **kwargs):
-        query = ""
-        if kwargs.get("params", None):
-            query = json.dumps(kwargs.get("params"), sort_keys=True)
-        key = self.get_cache_prefix() + md5_text(self.build_url(path), query).hexdigest()
+        key = self.get_cache_key(path, kwargs.get("params", None))
 
         result = cache.get(key)
-        if result is None:
+        if result is not None:
+            return result
+
+        # Only let one worker refresh a cold key. Everyone else waits for its
+        # result for as long as the lock may be held. If the lock goes away
+        # without a result, the request failed and they make it themselves.
+        lock_key = f"{key}:lock"
+        has_lock = cache.add(lock_key, 1, self.cache_lock_timeout)
+        if not has_lock:
+            for _ in range(int(self.cache_lock_timeout / self.cache_lock_retry_delay)):
+                time.sleep(self.cache_lock_retry_delay)
+                polled = cache.get_many([key, lock_key])
+                if polled.get(key) is not None:
+                    return polled[key]
+                if lock_key not in polled:
+                    break
+
+        try:
             result = self.request(method, path, *args, **kwargs)
             cache.set(key, result, self.cache_time)
+        finally:
+            if has_lock:
+                cache.delete(lock_key)
         return result
 
     def get_cached(self, path, *args, **kwargs):
@@ -350,21 +453,7 @@ class BaseInternalApiClient(ApiClient, TrackResponseMixin):
             tags={self.integration_type: self.name},
         )
 
-        try:
-            with sentry_sdk.configure_scope() as scope:
-                parent_span_id = scope.span.span_id
-                trace_id = scope.span.trace_id
-        except AttributeError:
-            parent_span_id = None
-            trace_id = None
-
-        with sentry_sdk.start_transaction(
-            op=f"{self.integration_type}.http",
-            name=f"{self.integration_type}.http_response.{self.name}",
-            parent_span_id=parent_span_id,
-            trace_id=trace_id,
-            sampled=True,
-        ) as span:
+        with self._start_http_transaction() as span:
             resp = ApiClient.request(self, *args, **kwargs)
             self.track_response_data(resp.status_code, span, None, resp)
             return resp
@@ -1,7 +1,5 @@
-from collections import OrderedDict
 from urllib.parse import urlparse
 
-from bs4 import BeautifulSoup
 from requests.exceptions import RequestException
 
 from sentry.utils import json
@@ -21,9 +19,11 @@ class ApiError(Exception):
         # TODO(dcramer): pull in XML support from Jira
         if text:
             try:
-                self.json = json.loads(text, object_pairs_hook=OrderedDict)
+                self.json = json.loads(text, use_rapid_json=True)
             except (json.JSONDecodeError, ValueError):
                 if self.text[:5] == "<?xml":
+                    from bs4 import BeautifulSoup
+
                     # perhaps it's XML?
                     self.xml = BeautifulSoup(self.text, "xml")
                 # must be an awful code.
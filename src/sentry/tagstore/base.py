@@ -70,6 +70,7 @@ class TagStorage(Service):
                 "get_standardized_key",
                 "get_tag_key_label",
                 "get_tag_value_label",
+                "get_tag_value_labels",
             ]
         )
         | __read_methods__
@@ -117,6 +118,14 @@ class TagStorage(Service):
 
         return label
 
+    def get_tag_value_labels(self, key_value_pairs):
+        """
+        >>> get_tag_value_labels([("sentry:user", "id:1"), ("browser", "Chrome")])
+        """
+        return {
+            (key, value): self.get_tag_value_label(key, value) for key, value in key_value_pairs
+        }
+
     @raises([TagKeyNotFound])
     def get_tag_key(self, project_id, environment_id, key, status=TagKeyStatus.VISIBLE):
         """
@@ -1,10 +1,20 @@
+from unittest.mock import patch
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from sentry.incidents.logic import CRITICAL_TRIGGER_LABEL
 from sentry.integrations.slack.message_builder import LEVEL_TO_COLOR
 from sentry.integrations.slack.message_builder.incidents import SlackIncidentsMessageBuilder
-from sentry.integrations.slack.message_builder.issues import SlackIssuesMessageBuilder
+from sentry.integrations.slack.message_builder.issues import (
+    SlackIssuesMessageBuilder,
+    has_releases_bulk,
+)
+from sentry.models import Activity, Group, Identity, IdentityProvider, IdentityStatus
+from sentry.notifications.notifications.activity import ResolvedActivityNotification
 from sentry.testutils import TestCase
+from sentry.types.activity import ActivityType
 from sentry.utils.assets import get_asset_url
 from sentry.utils.dates import to_timestamp
 from sentry.utils.http import absolute_uri
@@ -259,3 +269,103 @@ class BuildIncidentAttachmentTest(TestCase):
             SlackIssuesMessageBuilder(warning_event.group, warning_event).build()["color"]
             == "#FFC227"
         )
+
+    def test_build_group_attachment_tags(self):
+        event = self.store_event(
+            data={"level": "error", "user": {"id": "1"}, "tags": {"browser": "Chrome"}},
+            project_id=self.project.id,
+        )
+        # Tags are matched on their standardized key, `sentry:user` is requested as `user`.
+        attachment = SlackIssuesMessageBuilder(event.group, event, tags={"level", "user"}).build()
+        fields = attachment["fields"]
+        assert fields == [
+            {"title": "level", "value": "error", "short": True},
+            {"title": "user", "value": "1", "short": True},
+        ]
+        assert all(type(field["title"]) is str and type(field["value"]) is str for field in fields)
+
+    def test_build_group_attachment_latest_event_only_when_needed(self):
+        event = self.store_event(data={"level": "warning"}, project_id=self.project.id)
+        group = event.group
+        notification = ResolvedActivityNotification(
+            Activity(
+                project=self.project,
+                group=group,
+                user=self.user,
+                type=ActivityType.SET_RESOLVED,
+                data={"assignee": ""},
+            )
+        )
+
+        with patch.object(
+            Group, "get_latest_event", autospec=True, return_value=event
+        ) as get_latest_event:
+            SlackIssuesMessageBuilder(group, notification=notification).build()
+            assert not get_latest_event.called
+
+            SlackIssuesMessageBuilder(group, tags={"level"}, notification=notification).build()
+            get_latest_event.assert_called_once_with(group)
+
+    def test_build_group_attachment_actioned(self):
+        event = self.store_event(
+            data={"exception": {"values": [{"type": "ValueError", "value": "oh no"}]}},
+            project_id=self.project.id,
+        )
+        idp = IdentityProvider.objects.create(type="slack", external_id="TXXXXXXX1", config={})
+        identity = Identity.objects.create(
+            external_id="UXXXXXXX1",
+            idp=idp,
+            user=self.user,
+            status=IdentityStatus.VALID,
+            scopes=[],
+        )
+
+        attachment = SlackIssuesMessageBuilder(
+            event.group,
+            event,
+            identity=identity,
+            actions=[{"name": "status", "value": "ignored", "type": "button"}],
+        ).build()
+        assert attachment["text"] == "oh no\n*Issue ignored by <@UXXXXXXX1>*"
+        assert attachment["actions"] == []
+
+    def test_build_group_attachment_option_groups_cached_per_project(self):
+        group = self.create_group(project=self.project)
+        other_group = self.create_group(project=self.project)
+
+        def user_and_team_queries(queries):
+            return [
+                query["sql"]
+                for query in queries.captured_queries
+                if '"auth_user"' in query["sql"] or '"sentry_team"' in query["sql"]
+            ]
+
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            option_groups = SlackIssuesMessageBuilder(group).build()["actions"][2]["option_groups"]
+        # One query for the members and one for the teams, the formatted options
+        # only read the columns they select.
+        assert len(user_and_team_queries(queries)) == 2
+
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            attachment = SlackIssuesMessageBuilder(other_group).build()
+        assert user_and_team_queries(queries) == []
+        assert attachment["actions"][2]["option_groups"] == option_groups
+
+
+class HasReleasesBulkTest(TestCase):
+    def test_simple(self):
+        project_without_releases = self.create_project()
+        self.create_release(project=self.project)
+
+        with self.assertNumQueries(1):
+            assert has_releases_bulk([self.project.id, project_without_releases.id]) == {
+                self.project.id: True,
+                project_without_releases.id: False,
+            }
+
+        # Both results are cached now, positive and negative alike.
+        with self.assertNumQueries(0):
+            assert has_releases_bulk([self.project.id, project_without_releases.id]) == {
+                self.project.id: True,
+                project_without_releases.id: False,
+            }
@@ -203,6 +203,13 @@ class SlackActionRequestTest(TestCase):
     def test_callback_data(self):
         assert self.slack_request.callback_data == {"issue": "I1"}
 
+    def test_empty_callback_data(self):
+        payload = json.loads(self.request.data["payload"])
+        payload.pop("callback_id")
+        self.request.data["payload"] = json.dumps(payload)
+
+        assert self.slack_request.callback_data == {}
+
     def test_validates_existence_of_payload(self):
         self.request.data.pop("payload")
 
@@ -9,6 +9,7 @@ from sentry.integrations.slack.tasks import (
     RedisRuleStatus,
     find_channel_id_for_alert_rule,
     find_channel_id_for_rule,
+    post_message,
 )
 from sentry.integrations.slack.utils import SLACK_RATE_LIMITED_MESSAGE
 from sentry.models import Rule
@@ -328,3 +329,25 @@ class SlackTasksTest(TestCase):
         trigger_action = AlertRuleTriggerAction.objects.get(integration=self.integration.id)
         assert trigger_action.target_identifier == "chan-id"
         assert AlertRule.objects.get(id=alert_rule.id)
+
+    @responses.activate
+    def test_post_message(self):
+        responses.add(
+            method=responses.POST,
+            url="https://slack.com/api/chat.postMessage",
+            status=200,
+            content_type="application/json",
+            body=json.dumps({"ok": True}),
+        )
+
+        with self.tasks():
+            post_message.apply_async(
+                kwargs={
+                    "payload": {"token": "xoxb-xxx", "channel": "chan-id", "text": "hello"},
+                    "log_error_message": "rule.fail.slack_post",
+                    "log_params": {},
+                }
+            )
+
+        assert len(responses.calls) == 1
+        assert responses.calls[0].request.url == "https://slack.com/api/chat.postMessage"
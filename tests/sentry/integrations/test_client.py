@@ -1,3 +1,4 @@
+import pickle
 from time import time
 from unittest import mock
 
@@ -7,6 +8,12 @@ from sentry.identity import register
 from sentry.identity.oauth2 import OAuth2Provider
 from sentry.integrations.client import ApiClient, OAuth2RefreshMixin
 from sentry.models import Identity, IdentityProvider
+from sentry.shared_integrations.client import (
+    HeadApiResponse,
+    MappingApiResponse,
+    SequenceApiResponse,
+)
+from sentry.shared_integrations.exceptions import ApiError
 from sentry.testutils import TestCase
 
 
@@ -46,18 +53,121 @@ class ApiClientTest(TestCase):
         resp = ApiClient().patch("http://example.com")
         assert resp.status_code == 200
 
+    @responses.activate
+    def test_session_reused(self):
+        responses.add(responses.GET, "http://example.com", json={})
+
+        with ApiClient() as client:
+            client.get("http://example.com")
+            session = client.session
+            client.get("http://example.com")
+            assert client.session is session
+
+        assert len(responses.calls) == 2
+        assert client._session is None
+
+    @responses.activate
+    def test_session_ignores_cookies(self):
+        responses.add(
+            responses.GET, "http://example.com", json={}, headers={"Set-Cookie": "a=b; Path=/"}
+        )
+
+        with ApiClient() as client:
+            client.get("http://example.com")
+            client.get("http://example.com")
+            assert len(client.session.cookies) == 0
+
+        assert "Cookie" not in responses.calls[1].request.headers
+
     @mock.patch("sentry.shared_integrations.client.cache")
     @responses.activate
     def test_cache_mocked(self, cache):
         cache.get.return_value = None
+        cache.add.return_value = True
         responses.add(responses.GET, "http://example.com", json={"key": "value1"})
         resp = ApiClient().get_cached("http://example.com")
         assert resp == {"key": "value1"}
 
-        key = "integration.undefined.client:a9b9f04336ce0181a08e774e01113b31"
+        key = "integration.undefined.client:02a3e18fe3b267ac4e32c97cf491901a"
         cache.get.assert_called_with(key)
         cache.set.assert_called_with(key, {"key": "value1"}, 900)
 
+    @mock.patch("sentry.shared_integrations.client.cache")
+    @responses.activate
+    def test_cache_releases_lock(self, cache):
+        cache.get.return_value = None
+        cache.add.return_value = True
+        responses.add(responses.GET, "http://example.com", json={"key": "value1"})
+
+        ApiClient().get_cached("http://example.com")
+
+        key = "integration.undefined.client:02a3e18fe3b267ac4e32c97cf491901a"
+        assert cache.method_calls[-2:] == [
+            mock.call.set(key, {"key": "value1"}, 900),
+            mock.call.delete(f"{key}:lock"),
+        ]
+
+    @mock.patch("sentry.shared_integrations.client.cache")
+    @responses.activate
+    def test_cache_releases_lock_on_error(self, cache):
+        cache.get.return_value = None
+        cache.add.return_value = True
+        responses.add(responses.GET, "http://example.com", status=500, json={})
+
+        with self.assertRaises(ApiError):
+            ApiClient().get_cached("http://example.com")
+
+        key = "integration.undefined.client:02a3e18fe3b267ac4e32c97cf491901a"
+        assert not cache.set.called
+        cache.delete.assert_called_once_with(f"{key}:lock")
+
+    @mock.patch("sentry.shared_integrations.client.time")
+    @mock.patch("sentry.shared_integrations.client.cache")
+    @responses.activate
+    def test_cache_waits_for_lock_holder(self, cache, mock_time):
+        key = "integration.undefined.client:02a3e18fe3b267ac4e32c97cf491901a"
+        cache.get.return_value = None
+        cache.get_many.side_effect = [{f"{key}:lock": 1}, {key: {"key": "value1"}}]
+        cache.add.return_value = False
+        responses.add(responses.GET, "http://example.com", json={"key": "value2"})
+
+        resp = ApiClient().get_cached("http://example.com")
+        assert resp == {"key": "value1"}
+        assert mock_time.sleep.call_count == 2
+        assert len(responses.calls) == 0
+        assert not cache.set.called
+
+    @mock.patch("sentry.shared_integrations.client.time")
+    @mock.patch("sentry.shared_integrations.client.cache")
+    @responses.activate
+    def test_cache_lock_holder_failed(self, cache, mock_time):
+        cache.get.return_value = None
+        cache.get_many.side_effect = [{}]
+        cache.add.return_value = False
+        responses.add(responses.GET, "http://example.com", json={"key": "value2"})
+
+        resp = ApiClient().get_cached("http://example.com")
+        assert resp == {"key": "value2"}
+        assert mock_time.sleep.call_count == 1
+        assert len(responses.calls) == 1
+        # The lock belongs to somebody else, leave it alone.
+        assert not cache.delete.called
+
+    @mock.patch("sentry.shared_integrations.client.time")
+    @mock.patch("sentry.shared_integrations.client.cache")
+    @responses.activate
+    def test_cache_lock_wait_covers_lock_timeout(self, cache, mock_time):
+        key = "integration.undefined.client:02a3e18fe3b267ac4e32c97cf491901a"
+        cache.get.return_value = None
+        cache.get_many.return_value = {f"{key}:lock": 1}
+        cache.add.return_value = False
+        responses.add(responses.GET, "http://example.com", json={"key": "value2"})
+
+        resp = ApiClient().get_cached("http://example.com")
+        assert resp == {"key": "value2"}
+        # 5 seconds of lock timeout, polled every 50ms.
+        assert mock_time.sleep.call_count == 100
+
     @responses.activate
     def test_get_cached_basic(self):
         responses.add(responses.GET, "http://example.com", json={"key": "value1"})
@@ -106,6 +216,30 @@ class ApiClientTest(TestCase):
         assert len(responses.calls) == 2
 
 
+class BaseApiResponseTest(TestCase):
+    def test_rel(self):
+        link = (
+            '<https://api.github.com/repos?page=2>; rel="next", '
+            '<https://api.github.com/repos?page=5>; rel="last"'
+        )
+        assert HeadApiResponse({"Link": link}, 200).rel == {
+            "next": "https://api.github.com/repos?page=2",
+            "last": "https://api.github.com/repos?page=5",
+        }
+        assert HeadApiResponse({}, 200).rel == {}
+
+    def test_pickle(self):
+        for resp in (
+            MappingApiResponse({"key": "value"}, {"Content-Type": "application/json"}, 200),
+            SequenceApiResponse([1, 2], {"Content-Type": "application/json"}, 200),
+        ):
+            assert not hasattr(resp, "__dict__")
+            unpickled = pickle.loads(pickle.dumps(resp))
+            assert unpickled == resp
+            assert unpickled.headers == resp.headers
+            assert unpickled.status_code == 200
+
+
 class OAuthProvider(OAuth2Provider):
     key = "oauth"
     name = "OAuth Provider"
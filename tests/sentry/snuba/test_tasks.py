@@ -1,11 +1,10 @@
 import abc
+import secrets
+import unittest
 from unittest.mock import Mock, patch
-from uuid import uuid4
 
 import pytest
-import responses
 from django.utils import timezone
-from exam import patcher
 
 from sentry.snuba.models import QueryDatasets, QuerySubscription, SnubaQuery, SnubaQueryEventType
 from sentry.snuba.tasks import (
@@ -18,19 +17,61 @@ from sentry.snuba.tasks import (
     update_subscription_in_snuba,
 )
 from sentry.testutils import TestCase
+from sentry.testutils.factories import Factories
 from sentry.utils import json
-from sentry.utils.snuba import _snuba_pool
 
+_CANNED_RESP = Mock(status=202, data=json.dumps({"subscription_id": "123"}))
 
-class BaseSnubaTaskTest(metaclass=abc.ABCMeta):
-    metrics = patcher("sentry.snuba.tasks.metrics")
 
+def get_status(sub):
+    return (
+        QuerySubscription.objects.filter(id=sub.id).values_list("status", "subscription_id").get()
+    )
+
+
+class BaseSnubaTaskTest(metaclass=abc.ABCMeta):
     status_translations = {
         QuerySubscription.Status.CREATING: "create",
         QuerySubscription.Status.UPDATING: "update",
         QuerySubscription.Status.DELETING: "delete",
     }
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._status_name = cls.status_translations[cls.expected_status]
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.project = Factories.create_project(organization=Factories.create_organization())
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Answer every Snuba subscription request with a canned response rather
+        # than going over the wire.
+        cls._request_bodies = []
+
+        def urlopen(method, url, body=None, **kwargs):
+            cls._request_bodies.append(body)
+            return _CANNED_RESP
+
+        cls._pool_patcher = patch("sentry.snuba.tasks._snuba_pool.urlopen", new=urlopen)
+        cls._pool_patcher.start()
+        cls._metrics_patcher = patch("sentry.snuba.tasks.metrics")
+        cls.metrics = cls._metrics_patcher.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._metrics_patcher.stop()
+        cls._pool_patcher.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self._request_bodies.clear()
+        self.metrics.reset_mock()
+
     @abc.abstractproperty
     def expected_status(self):
         pass
@@ -51,36 +92,41 @@ class BaseSnubaTaskTest(metaclass=abc.ABCMeta):
         time_window = 60
         resolution = 60
 
-        snuba_query = SnubaQuery.objects.create(
-            dataset=dataset,
-            aggregate=aggregate,
-            query=query,
-            time_window=time_window,
-            resolution=resolution,
+        (snuba_query,) = SnubaQuery.objects.bulk_create(
+            [
+                SnubaQuery(
+                    dataset=dataset,
+                    aggregate=aggregate,
+                    query=query,
+                    time_window=time_window,
+                    resolution=resolution,
+                )
+            ]
         )
-        return QuerySubscription.objects.create(
-            snuba_query=snuba_query,
-            status=status.value,
-            subscription_id=subscription_id,
-            project=self.project,
-            type="something",
+        (subscription,) = QuerySubscription.objects.bulk_create(
+            [
+                QuerySubscription(
+                    snuba_query=snuba_query,
+                    status=status.value,
+                    subscription_id=subscription_id,
+                    project=self.project,
+                    type="something",
+                )
+            ]
         )
+        return subscription
 
     def test_no_subscription(self):
         self.task(12345)
         self.metrics.incr.assert_called_once_with(
-            "snuba.subscriptions.{}.subscription_does_not_exist".format(
-                self.status_translations[self.expected_status]
-            )
+            f"snuba.subscriptions.{self._status_name}.subscription_does_not_exist"
         )
 
     def test_invalid_status(self):
         sub = self.create_subscription(QuerySubscription.Status.ACTIVE)
         self.task(sub.id)
         self.metrics.incr.assert_called_once_with(
-            "snuba.subscriptions.{}.incorrect_status".format(
-                self.status_translations[self.expected_status]
-            )
+            f"snuba.subscriptions.{self._status_name}.incorrect_status"
         )
 
 
@@ -90,7 +136,7 @@ class CreateSubscriptionInSnubaTest(BaseSnubaTaskTest, TestCase):
 
     def test_already_created(self):
         sub = self.create_subscription(
-            QuerySubscription.Status.CREATING, subscription_id=uuid4().hex
+            QuerySubscription.Status.CREATING, subscription_id=secrets.token_hex(16)
         )
         create_subscription_in_snuba(sub.id)
         self.metrics.incr.assert_any_call("snuba.subscriptions.create.already_created_in_snuba")
@@ -98,45 +144,37 @@ class CreateSubscriptionInSnubaTest(BaseSnubaTaskTest, TestCase):
     def test(self):
         sub = self.create_subscription(QuerySubscription.Status.CREATING)
         create_subscription_in_snuba(sub.id)
-        sub = QuerySubscription.objects.get(id=sub.id)
-        assert sub.status == QuerySubscription.Status.ACTIVE.value
-        assert sub.subscription_id is not None
+        status, sub_id = get_status(sub)
+        assert status == QuerySubscription.Status.ACTIVE.value
+        assert sub_id is not None
 
     def test_group_id(self):
         group_id = 1234
         sub = self.create_subscription(
             QuerySubscription.Status.CREATING, query=f"issue.id:{group_id}"
         )
-        with patch.object(_snuba_pool, "urlopen", side_effect=_snuba_pool.urlopen) as urlopen:
-            create_subscription_in_snuba(sub.id)
-            assert ["group_id", "IN", [group_id]] in json.loads(urlopen.call_args[1]["body"])[
-                "conditions"
-            ]
-        sub = QuerySubscription.objects.get(id=sub.id)
-        assert sub.status == QuerySubscription.Status.ACTIVE.value
-        assert sub.subscription_id is not None
+        create_subscription_in_snuba(sub.id)
+        assert ["group_id", "IN", [group_id]] in json.loads(
+            self._request_bodies[-1], use_rapid_json=True
+        )["conditions"]
+        status, sub_id = get_status(sub)
+        assert status == QuerySubscription.Status.ACTIVE.value
+        assert sub_id is not None
 
     def test_transaction(self):
         sub = self.create_subscription(
             QuerySubscription.Status.CREATING, dataset=QueryDatasets.TRANSACTIONS
         )
         create_subscription_in_snuba(sub.id)
-        sub = QuerySubscription.objects.get(id=sub.id)
-        assert sub.status == QuerySubscription.Status.ACTIVE.value
-        assert sub.subscription_id is not None
+        status, sub_id = get_status(sub)
+        assert status == QuerySubscription.Status.ACTIVE.value
+        assert sub_id is not None
 
-    @responses.activate
     def test_adds_type(self):
         sub = self.create_subscription(QuerySubscription.Status.CREATING)
-        with patch("sentry.snuba.tasks._snuba_pool") as pool:
-            resp = Mock()
-            resp.status = 202
-            resp.data = json.dumps({"subscription_id": "123"})
-            pool.urlopen.return_value = resp
-
-            create_subscription_in_snuba(sub.id)
-            request_body = json.loads(pool.urlopen.call_args[1]["body"])
-            assert ["type", "=", "error"] in request_body["conditions"]
+        create_subscription_in_snuba(sub.id)
+        request_body = json.loads(self._request_bodies[-1], use_rapid_json=True)
+        assert ["type", "=", "error"] in request_body["conditions"]
 
 
 class UpdateSubscriptionInSnubaTest(BaseSnubaTaskTest, TestCase):
@@ -144,23 +182,23 @@ class UpdateSubscriptionInSnubaTest(BaseSnubaTaskTest, TestCase):
     task = update_subscription_in_snuba
 
     def test(self):
-        subscription_id = f"1/{uuid4().hex}"
+        subscription_id = f"1/{secrets.token_hex(16)}"
         sub = self.create_subscription(
             QuerySubscription.Status.UPDATING, subscription_id=subscription_id
         )
         update_subscription_in_snuba(sub.id)
-        sub = QuerySubscription.objects.get(id=sub.id)
-        assert sub.status == QuerySubscription.Status.ACTIVE.value
-        assert sub.subscription_id is not None
-        assert sub.subscription_id != subscription_id
+        status, sub_id = get_status(sub)
+        assert status == QuerySubscription.Status.ACTIVE.value
+        assert sub_id is not None
+        assert sub_id != subscription_id
 
     def test_no_subscription_id(self):
         sub = self.create_subscription(QuerySubscription.Status.UPDATING)
         assert sub.subscription_id is None
         update_subscription_in_snuba(sub.id)
-        sub = QuerySubscription.objects.get(id=sub.id)
-        assert sub.status == QuerySubscription.Status.ACTIVE.value
-        assert sub.subscription_id is not None
+        status, sub_id = get_status(sub)
+        assert status == QuerySubscription.Status.ACTIVE.value
+        assert sub_id is not None
 
 
 class DeleteSubscriptionFromSnubaTest(BaseSnubaTaskTest, TestCase):
@@ -168,7 +206,7 @@ class DeleteSubscriptionFromSnubaTest(BaseSnubaTaskTest, TestCase):
     task = delete_subscription_from_snuba
 
     def test(self):
-        subscription_id = f"1/{uuid4().hex}"
+        subscription_id = f"1/{secrets.token_hex(16)}"
         sub = self.create_subscription(
             QuerySubscription.Status.DELETING, subscription_id=subscription_id
         )
@@ -182,7 +220,7 @@ class DeleteSubscriptionFromSnubaTest(BaseSnubaTaskTest, TestCase):
         assert not QuerySubscription.objects.filter(id=sub.id).exists()
 
 
-class BuildSnubaFilterTest(TestCase):
+class BuildSnubaFilterTest(unittest.TestCase):
     def test_simple_events(self):
         snuba_filter = build_snuba_filter(
             QueryDatasets.EVENTS, "", "count_unique(user)", None, None
@@ -199,42 +237,6 @@ class BuildSnubaFilterTest(TestCase):
         assert snuba_filter.conditions == []
         assert snuba_filter.aggregations == [["uniq", "user", "count_unique_user"]]
 
-    def test_simple_sessions(self):
-        snuba_filter = build_snuba_filter(
-            dataset=QueryDatasets.SESSIONS,
-            query="",
-            aggregate="percentage(sessions_crashed, sessions) AS _crash_rate_alert_aggregate",
-            environment=None,
-            event_types=[],
-        )
-        assert snuba_filter
-        assert snuba_filter.aggregations == [
-            [
-                "if(greater(sessions,0),divide(sessions_crashed,sessions),null)",
-                None,
-                "_crash_rate_alert_aggregate",
-            ],
-            ["identity", "sessions", "_total_count"],
-        ]
-
-    def test_simple_users(self):
-        snuba_filter = build_snuba_filter(
-            dataset=QueryDatasets.SESSIONS,
-            query="",
-            aggregate="percentage(users_crashed, users) AS _crash_rate_alert_aggregate",
-            environment=None,
-            event_types=[],
-        )
-        assert snuba_filter
-        assert snuba_filter.aggregations == [
-            [
-                "if(greater(users,0),divide(users_crashed,users),null)",
-                None,
-                "_crash_rate_alert_aggregate",
-            ],
-            ["identity", "users", "_total_count"],
-        ]
-
     def test_aliased_query_events(self):
         snuba_filter = build_snuba_filter(
             QueryDatasets.EVENTS, "release:latest", "count_unique(user)", None, None
@@ -246,52 +248,6 @@ class BuildSnubaFilterTest(TestCase):
         ]
         assert snuba_filter.aggregations == [["uniq", "tags[sentry:user]", "count_unique_user"]]
 
-    def test_query_and_environment_sessions(self):
-        env = self.create_environment(self.project, name="development")
-        snuba_filter = build_snuba_filter(
-            dataset=QueryDatasets.SESSIONS,
-            query="release:ahmed@12.2",
-            aggregate="percentage(sessions_crashed, sessions) AS _crash_rate_alert_aggregate",
-            environment=env,
-            event_types=[],
-        )
-        assert snuba_filter
-        assert snuba_filter.aggregations == [
-            [
-                "if(greater(sessions,0),divide(sessions_crashed,sessions),null)",
-                None,
-                "_crash_rate_alert_aggregate",
-            ],
-            ["identity", "sessions", "_total_count"],
-        ]
-        assert snuba_filter.conditions == [
-            ["release", "=", "ahmed@12.2"],
-            ["environment", "=", "development"],
-        ]
-
-    def test_query_and_environment_users(self):
-        env = self.create_environment(self.project, name="development")
-        snuba_filter = build_snuba_filter(
-            dataset=QueryDatasets.SESSIONS,
-            query="release:ahmed@12.2",
-            aggregate="percentage(users_crashed, users) AS _crash_rate_alert_aggregate",
-            environment=env,
-            event_types=[],
-        )
-        assert snuba_filter
-        assert snuba_filter.aggregations == [
-            [
-                "if(greater(users,0),divide(users_crashed,users),null)",
-                None,
-                "_crash_rate_alert_aggregate",
-            ],
-            ["identity", "users", "_total_count"],
-        ]
-        assert snuba_filter.conditions == [
-            ["release", "=", "ahmed@12.2"],
-            ["environment", "=", "development"],
-        ]
-
     def test_aliased_query_transactions(self):
         snuba_filter = build_snuba_filter(
             QueryDatasets.TRANSACTIONS,
@@ -372,162 +328,202 @@ class BuildSnubaFilterTest(TestCase):
         assert snuba_filter.aggregations == [["uniq", "tags[sentry:user]", "count_unique_user"]]
 
 
-class TestApplyDatasetQueryConditions(TestCase):
-    def test_no_event_types_no_discover(self):
-        assert (
-            apply_dataset_query_conditions(QueryDatasets.EVENTS, "release:123", None, False)
-            == "(event.type:error) AND (release:123)"
-        )
-        assert (
-            apply_dataset_query_conditions(
-                QueryDatasets.EVENTS, "release:123 OR release:456", None, False
-            )
-            == "(event.type:error) AND (release:123 OR release:456)"
-        )
-        assert (
-            apply_dataset_query_conditions(QueryDatasets.TRANSACTIONS, "release:123", None, False)
-            == "release:123"
-        )
-        assert (
-            apply_dataset_query_conditions(
-                QueryDatasets.TRANSACTIONS, "release:123 OR release:456", None, False
-            )
-            == "release:123 OR release:456"
-        )
-
-    def test_no_event_types_discover(self):
-        assert (
-            apply_dataset_query_conditions(QueryDatasets.EVENTS, "release:123", None, True)
-            == "(event.type:error) AND (release:123)"
-        )
-        assert (
-            apply_dataset_query_conditions(
-                QueryDatasets.EVENTS, "release:123 OR release:456", None, True
-            )
-            == "(event.type:error) AND (release:123 OR release:456)"
-        )
-        assert (
-            apply_dataset_query_conditions(QueryDatasets.TRANSACTIONS, "release:123", None, True)
-            == "(event.type:transaction) AND (release:123)"
-        )
-        assert (
-            apply_dataset_query_conditions(
-                QueryDatasets.TRANSACTIONS, "release:123 OR release:456", None, True
-            )
-            == "(event.type:transaction) AND (release:123 OR release:456)"
-        )
-
-    def test_event_types_no_discover(self):
-        assert (
-            apply_dataset_query_conditions(
-                QueryDatasets.EVENTS, "release:123", [SnubaQueryEventType.EventType.ERROR], False
-            )
-            == "(event.type:error) AND (release:123)"
-        )
-        assert (
-            apply_dataset_query_conditions(
-                QueryDatasets.EVENTS,
-                "release:123",
-                [SnubaQueryEventType.EventType.ERROR, SnubaQueryEventType.EventType.DEFAULT],
-                False,
-            )
-            == "(event.type:error OR event.type:default) AND (release:123)"
-        )
-        assert (
-            apply_dataset_query_conditions(
-                QueryDatasets.TRANSACTIONS,
-                "release:123",
-                [SnubaQueryEventType.EventType.TRANSACTION],
-                False,
-            )
-            == "release:123"
-        )
-        assert (
-            apply_dataset_query_conditions(
-                QueryDatasets.SESSIONS,
-                "release:123",
-                [],
-                False,
-            )
-            == "release:123"
-        )
-
-    def test_event_types_discover(self):
-        assert (
-            apply_dataset_query_conditions(
-                QueryDatasets.EVENTS, "release:123", [SnubaQueryEventType.EventType.ERROR], True
-            )
-            == "(event.type:error) AND (release:123)"
-        )
-        assert (
-            apply_dataset_query_conditions(
-                QueryDatasets.EVENTS,
-                "release:123",
-                [SnubaQueryEventType.EventType.ERROR, SnubaQueryEventType.EventType.DEFAULT],
-                True,
-            )
-            == "(event.type:error OR event.type:default) AND (release:123)"
-        )
-        assert (
-            apply_dataset_query_conditions(
-                QueryDatasets.TRANSACTIONS,
-                "release:123",
-                [SnubaQueryEventType.EventType.TRANSACTION],
-                True,
-            )
-            == "(event.type:transaction) AND (release:123)"
-        )
+def _crash_rate_aggregations(metric):
+    return [
+        [
+            f"if(greater({metric},0),divide({metric}_crashed,{metric}),null)",
+            None,
+            "_crash_rate_alert_aggregate",
+        ],
+        ["identity", metric, "_total_count"],
+    ]
+
+
+@pytest.mark.parametrize("metric", ["sessions", "users"])
+def test_simple_crash_rate(metric):
+    snuba_filter = build_snuba_filter(
+        dataset=QueryDatasets.SESSIONS,
+        query="",
+        aggregate=f"percentage({metric}_crashed, {metric}) AS _crash_rate_alert_aggregate",
+        environment=None,
+        event_types=[],
+    )
+    assert snuba_filter
+    assert snuba_filter.aggregations == _crash_rate_aggregations(metric)
+
+
+class BuildSnubaFilterEnvironmentTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        project = Factories.create_project(organization=Factories.create_organization())
+        cls.env = Factories.create_environment(project, name="development")
+
+    def test_query_and_environment(self):
+        for metric in ("sessions", "users"):
+            with self.subTest(metric=metric):
+                snuba_filter = build_snuba_filter(
+                    dataset=QueryDatasets.SESSIONS,
+                    query="release:ahmed@12.2",
+                    aggregate=f"percentage({metric}_crashed, {metric}) AS _crash_rate_alert_aggregate",
+                    environment=self.env,
+                    event_types=[],
+                )
+                assert snuba_filter
+                assert snuba_filter.aggregations == _crash_rate_aggregations(metric)
+                assert snuba_filter.conditions == [
+                    ["release", "=", "ahmed@12.2"],
+                    ["environment", "=", "development"],
+                ]
+
+
+@pytest.mark.parametrize(
+    "dataset,query,event_types,discover,expected",
+    [
+        (QueryDatasets.EVENTS, "release:123", None, False, "(event.type:error) AND (release:123)"),
+        (
+            QueryDatasets.EVENTS,
+            "release:123 OR release:456",
+            None,
+            False,
+            "(event.type:error) AND (release:123 OR release:456)",
+        ),
+        (QueryDatasets.TRANSACTIONS, "release:123", None, False, "release:123"),
+        (
+            QueryDatasets.TRANSACTIONS,
+            "release:123 OR release:456",
+            None,
+            False,
+            "release:123 OR release:456",
+        ),
+        (QueryDatasets.EVENTS, "release:123", None, True, "(event.type:error) AND (release:123)"),
+        (
+            QueryDatasets.EVENTS,
+            "release:123 OR release:456",
+            None,
+            True,
+            "(event.type:error) AND (release:123 OR release:456)",
+        ),
+        (
+            QueryDatasets.TRANSACTIONS,
+            "release:123",
+            None,
+            True,
+            "(event.type:transaction) AND (release:123)",
+        ),
+        (
+            QueryDatasets.TRANSACTIONS,
+            "release:123 OR release:456",
+            None,
+            True,
+            "(event.type:transaction) AND (release:123 OR release:456)",
+        ),
+        (
+            QueryDatasets.EVENTS,
+            "release:123",
+            [SnubaQueryEventType.EventType.ERROR],
+            False,
+            "(event.type:error) AND (release:123)",
+        ),
+        (
+            QueryDatasets.EVENTS,
+            "release:123",
+            [SnubaQueryEventType.EventType.ERROR, SnubaQueryEventType.EventType.DEFAULT],
+            False,
+            "(event.type:error OR event.type:default) AND (release:123)",
+        ),
+        (
+            QueryDatasets.TRANSACTIONS,
+            "release:123",
+            [SnubaQueryEventType.EventType.TRANSACTION],
+            False,
+            "release:123",
+        ),
+        (QueryDatasets.SESSIONS, "release:123", [], False, "release:123"),
+        (
+            QueryDatasets.EVENTS,
+            "release:123",
+            [SnubaQueryEventType.EventType.ERROR],
+            True,
+            "(event.type:error) AND (release:123)",
+        ),
+        (
+            QueryDatasets.EVENTS,
+            "release:123",
+            [SnubaQueryEventType.EventType.ERROR, SnubaQueryEventType.EventType.DEFAULT],
+            True,
+            "(event.type:error OR event.type:default) AND (release:123)",
+        ),
+        (
+            QueryDatasets.TRANSACTIONS,
+            "release:123",
+            [SnubaQueryEventType.EventType.TRANSACTION],
+            True,
+            "(event.type:transaction) AND (release:123)",
+        ),
+    ],
+)
+def test_apply_dataset_query_conditions(dataset, query, event_types, discover, expected):
+    assert apply_dataset_query_conditions(dataset, query, event_types, discover) == expected
 
 
 class SubscriptionCheckerTest(TestCase):
-    def create_subscription(self, status, subscription_id=None, date_updated=None):
-        dataset = QueryDatasets.EVENTS.value
-        aggregate = "count_unique(tags[sentry:user])"
-        query = "hello"
-        time_window = 60
-        resolution = 60
-
-        snuba_query = SnubaQuery.objects.create(
-            dataset=dataset,
-            aggregate=aggregate,
-            query=query,
-            time_window=time_window,
-            resolution=resolution,
-        )
-        sub = QuerySubscription.objects.create(
-            snuba_query=snuba_query,
-            status=status.value,
-            subscription_id=subscription_id,
-            project=self.project,
-            type="something",
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.project = Factories.create_project(organization=Factories.create_organization())
+
+    def setUp(self):
+        super().setUp()
+        self.snuba_query = SnubaQuery.objects.create(
+            dataset=QueryDatasets.EVENTS.value,
+            aggregate="count_unique(tags[sentry:user])",
+            query="hello",
+            time_window=60,
+            resolution=60,
+        )
+
+    def create_subscriptions(self, statuses_and_dates):
+        # `bulk_create` skips the pre_save hook that bumps `date_updated`, so
+        # the requested timestamps can be written with the initial insert.
+        return QuerySubscription.objects.bulk_create(
+            [
+                QuerySubscription(
+                    snuba_query=self.snuba_query,
+                    status=status.value,
+                    project=self.project,
+                    type="something",
+                    date_updated=date_updated,
+                )
+                for status, date_updated in statuses_and_dates
+            ]
         )
-        if date_updated:
-            QuerySubscription.objects.filter(id=sub.id).update(date_updated=date_updated)
-        return sub
 
     def test_create_update(self):
-        for status in (
+        statuses = (
             QuerySubscription.Status.CREATING,
             QuerySubscription.Status.UPDATING,
             QuerySubscription.Status.DELETING,
-        ):
-            sub = self.create_subscription(
-                status,
-                date_updated=timezone.now() - SUBSCRIPTION_STATUS_MAX_AGE * 2,
-            )
-            sub_new = self.create_subscription(status, date_updated=timezone.now())
-            with self.tasks():
-                subscription_checker()
+        )
+        now = timezone.now()
+        old_date = now - SUBSCRIPTION_STATUS_MAX_AGE * 2
+        subs = self.create_subscriptions(
+            [(status, date) for status in statuses for date in (old_date, now)]
+        )
+        with self.tasks():
+            subscription_checker()
+
+        for status, sub, sub_new in zip(statuses, subs[::2], subs[1::2]):
             if status == QuerySubscription.Status.DELETING:
                 with pytest.raises(QuerySubscription.DoesNotExist):
                     QuerySubscription.objects.get(id=sub.id)
-                sub_new = QuerySubscription.objects.get(id=sub_new.id)
-                assert sub_new.status == status.value
-                assert sub_new.subscription_id is None
+                current_status, sub_id = get_status(sub_new)
+                assert current_status == status.value
+                assert sub_id is None
             else:
-                sub = QuerySubscription.objects.get(id=sub.id)
-                assert sub.status == QuerySubscription.Status.ACTIVE.value
-                assert sub.subscription_id is not None
-                sub_new = QuerySubscription.objects.get(id=sub_new.id)
-                assert sub_new.status == status.value
-                assert sub_new.subscription_id is None
+                current_status, sub_id = get_status(sub)
+                assert current_status == QuerySubscription.Status.ACTIVE.value
+                assert sub_id is not None
+                current_status, sub_id = get_status(sub_new)
+                assert current_status == status.value
+                assert sub_id is None
@@ -307,6 +307,13 @@ class TagStorageTest(TestCase, SnubaTestCase):
         assert self.ts.get_tag_value_label("sentry:user", "username:stuff") == "stuff"
         assert self.ts.get_tag_value_label("sentry:user", "ip:stuff") == "stuff"
 
+    def test_get_tag_value_labels(self):
+        assert self.ts.get_tag_value_labels([]) == {}
+        assert self.ts.get_tag_value_labels([("foo", "notreal"), ("sentry:user", "id:stuff")]) == {
+            ("foo", "notreal"): "notreal",
+            ("sentry:user", "id:stuff"): "stuff",
+        }
+
     def test_get_groups_user_counts(self):
         assert (
             self.ts.get_groups_user_counts(